@@ -1,9 +1,19 @@
-from flask import Flask, render_template, request, jsonify
-from mailbot import MailBot, load_config, save_config, encrypt_password, load_processed
+from flask import Flask, render_template, request, jsonify, Response
+from mailbot import MailBot, load_config, save_config, encrypt_password, load_processed, with_processed_state, shutdown_pool, close_browser, UNSUBSCRIBE_WORKERS
+from concurrent.futures import ThreadPoolExecutor
 import threading
+import atexit
+import json
+import queue
+import time
+import uuid
 
 app = Flask(__name__)
 
+# Gepoolte IMAP-Verbindungen und den offenen Browser beim Beenden schließen
+atexit.register(shutdown_pool)
+atexit.register(close_browser)
+
 # Globaler Bot und Scan-Status
 bot = None
 scan_status = {
@@ -18,6 +28,71 @@ unsubscribe_status = {
     "total": 0,
     "results": []
 }
+# Schützen die Status-Dicts, die Worker-Threads schreiben und Requests lesen
+_scan_lock = threading.Lock()
+_unsub_lock = threading.Lock()
+
+# Abmelde-Jobs (job_id, newsletter, löschen) für den Worker-Thread
+_unsubscribe_queue = queue.Queue()
+# Eingereihte plus laufender Job; qsize() allein zählt den laufenden nicht mit
+_open_unsubscribe_jobs = 0
+_unsubscribe_bot = None
+
+# Fortschritts-Queues laufender Jobs für Server-Sent Events, nach Job-ID
+SSE_HEARTBEAT_INTERVAL = 15
+SSE_JOB_RETENTION = 300
+_jobs = {}
+_jobs_lock = threading.Lock()
+
+
+def _create_job():
+    """Legt eine Fortschritts-Queue für einen neuen Job an."""
+    job_id = uuid.uuid4().hex
+    now = time.time()
+    with _jobs_lock:
+        # Abgeschlossene Jobs entfernen, deren Stream nie abgeholt wurde
+        for old_id, job in list(_jobs.items()):
+            if job["finished_at"] and now - job["finished_at"] > SSE_JOB_RETENTION:
+                del _jobs[old_id]
+        _jobs[job_id] = {"queue": queue.Queue(), "finished_at": None}
+    return job_id
+
+
+def _publish(job_id, event, done=False):
+    """Schickt ein Fortschritts-Event an den Stream eines Jobs."""
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+        if not job:
+            return
+        if done:
+            event = dict(event, done=True)
+            job["finished_at"] = time.time()
+    job["queue"].put(event)
+
+
+def _stream_job(job_id):
+    """Liefert die Events eines Jobs als text/event-stream."""
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+    if not job:
+        return jsonify({"success": False, "message": "Unbekannter Job"}), 404
+
+    def generate():
+        while True:
+            try:
+                event = job["queue"].get(timeout=SSE_HEARTBEAT_INTERVAL)
+            except queue.Empty:
+                # Kommentarzeile hält Proxies und Browser-Verbindung offen
+                yield ": heartbeat\n\n"
+                continue
+
+            yield f"data: {json.dumps(event)}\n\n"
+            if event.get("done"):
+                with _jobs_lock:
+                    _jobs.pop(job_id, None)
+                return
+
+    return Response(generate(), mimetype="text/event-stream", headers={"Cache-Control": "no-cache"})
 
 
 @app.route("/")
@@ -71,166 +146,287 @@ def start_scan():
     """Startet den Newsletter-Scan."""
     global bot, scan_status
 
-    if scan_status["scanning"]:
-        return jsonify({"success": False, "message": "Scan läuft bereits"})
-
     # Limit aus Request holen
     data = request.get_json() or {}
     limit = data.get("limit")
 
+    # Prüfen und Setzen in einem Schritt, damit kein zweiter Scan dazwischenkommt
+    with _scan_lock:
+        if scan_status["scanning"]:
+            return jsonify({"success": False, "message": "Scan läuft bereits"})
+        scan_status.update(scanning=True, progress=0, message="Verbinde...", newsletters=[])
+
+    job_id = _create_job()
+
+    def report(done=False, **event):
+        """Aktualisiert den Scan-Status und meldet ihn an den Event-Stream."""
+        with _scan_lock:
+            if done:
+                scan_status["scanning"] = False
+            scan_status.update({k: v for k, v in event.items() if k in scan_status})
+        _publish(job_id, event, done=done)
+
     def do_scan(limit_per_folder):
-        global bot, scan_status
-        scan_status["scanning"] = True
-        scan_status["progress"] = 0
-        scan_status["message"] = "Verbinde..."
-        scan_status["newsletters"] = []
+        global bot
+        report(progress=0, message="Verbinde...")
 
         try:
             bot = MailBot()
+            # Nur Zugangsdaten prüfen: scan_all() scannt jeden Ordner über eine
+            # eigene Verbindung, diese geht gleich an den Pool zurück
             success, message = bot.connect()
+            bot.disconnect()
 
             if not success:
-                scan_status["message"] = message
-                scan_status["scanning"] = False
+                report(done=True, progress=0, message=message, newsletters=[])
                 return
 
-            scan_status["progress"] = 20
             if limit_per_folder:
-                scan_status["message"] = f"Scanne Posteingang und Spam ({limit_per_folder} E-Mails pro Ordner)..."
+                report(progress=20, message=f"Scanne Posteingang und Spam ({limit_per_folder} Newsletter pro Ordner)...")
             else:
-                scan_status["message"] = "Scanne Posteingang und Spam (alle E-Mails)..."
+                report(progress=20, message="Scanne Posteingang und Spam (alle Newsletter)...")
 
-            newsletters = bot.scan_all(limit_per_folder=limit_per_folder)
+            scanned_folders = []
 
-            scan_status["progress"] = 90
-            scan_status["message"] = f"{len(newsletters)} Newsletter gefunden"
-            scan_status["newsletters"] = newsletters
+            def folder_done(folder, folder_newsletters):
+                scanned_folders.append(folder)
+                report(
+                    progress=20 + 35 * len(scanned_folders),
+                    message=f"{folder}: {len(folder_newsletters)} Newsletter gefunden",
+                    partial=folder_newsletters
+                )
 
-            bot.disconnect()
+            newsletters = bot.scan_all(limit_per_folder=limit_per_folder, progress_callback=folder_done)
 
-            scan_status["progress"] = 100
-            scan_status["scanning"] = False
+            message = f"{len(newsletters)} Newsletter gefunden"
+            report(progress=90, message=message)
+
+            report(done=True, progress=100, message=message, newsletters=newsletters)
 
         except Exception as e:
-            scan_status["message"] = f"Fehler: {str(e)}"
-            scan_status["scanning"] = False
+            with _scan_lock:
+                progress = scan_status["progress"]
+            report(done=True, progress=progress, message=f"Fehler: {str(e)}", newsletters=[])
 
     thread = threading.Thread(target=do_scan, args=(limit,))
     thread.start()
 
-    return jsonify({"success": True, "message": "Scan gestartet"})
+    return jsonify({"success": True, "message": "Scan gestartet", "job_id": job_id})
+
+
+@app.route("/api/scan/stream/<job_id>")
+def scan_stream(job_id):
+    """Streamt den Scan-Fortschritt als Server-Sent Events."""
+    return _stream_job(job_id)
 
 
 @app.route("/api/scan/status")
 def scan_status_api():
     """Gibt den aktuellen Scan-Status zurück."""
-    return jsonify(scan_status)
+    with _scan_lock:
+        snapshot = dict(scan_status)
+        snapshot["newsletters"] = list(scan_status["newsletters"])
+    return jsonify(snapshot)
 
 
 @app.route("/api/newsletters")
 def get_newsletters():
     """Gibt die gefundenen Newsletter zurück."""
     processed = load_processed()
-    newsletters = scan_status.get("newsletters", [])
+    with _scan_lock:
+        newsletters = list(scan_status["newsletters"])
 
-    # Status aktualisieren
-    for nl in newsletters:
-        nl["processed"] = nl["id"] in processed.get("processed_ids", [])
-        nl["unsubscribed"] = nl["id"] in processed.get("unsubscribed", [])
+    # Status aktualisieren (auf Kopien, der Scan-Status bleibt unverändert)
+    newsletters = [with_processed_state(nl, processed) for nl in newsletters]
 
     return jsonify(newsletters)
 
 
-@app.route("/api/unsubscribe", methods=["POST"])
-def unsubscribe():
-    """Meldet von ausgewählten Newslettern ab."""
-    global bot, unsubscribe_status
+def _get_unsubscribe_bot():
+    """Gibt den gemeinsamen Bot des Abmelde-Workers zurück.
+
+    Der Bot bleibt über Jobs hinweg bestehen (IMAP-Pool, HTTP-Session) und wird
+    nur neu erstellt, wenn sich die Konfiguration geändert hat.
+    """
+    global _unsubscribe_bot
+    if _unsubscribe_bot is None or _unsubscribe_bot.config != load_config():
+        if _unsubscribe_bot:
+            _unsubscribe_bot.disconnect()
+        _unsubscribe_bot = MailBot()
+    else:
+        _unsubscribe_bot.processed = load_processed()
+    return _unsubscribe_bot
+
+
+def _run_unsubscribe_job(job_id, newsletters_to_unsubscribe, should_delete):
+    """Arbeitet einen Abmelde-Job ab und meldet den Fortschritt."""
+    with _unsub_lock:
+        unsubscribe_status.update(
+            running=True,
+            current=0,
+            total=len(newsletters_to_unsubscribe),
+            results=[]
+        )
+
+    def process(nl):
+        results = worker_bot.unsubscribe(nl, persist=False)
+
+        status = "error"
+        message = "Keine Abmelde-Links gefunden"
+
+        if results:
+            if any(r["status"] == "success" for r in results):
+                status = "success"
+                message = "Erfolgreich abgemeldet"
+
+            elif any(r["status"] == "needs_confirmation" for r in results):
+                status = "needs_confirmation"
+                message = "Manuelle Bestätigung erforderlich"
+                # Link für manuelle Bestätigung hinzufügen
+                for r in results:
+                    if r["status"] == "needs_confirmation":
+                        message += f" - {r['link']}"
+                        break
+            else:
+                message = results[0].get("message", "Fehler")
+
+        result = {
+            "newsletter": nl["from"],
+            "status": status,
+            "message": message
+        }
+
+        # E-Mail löschen wenn Option aktiviert; gesammelt nach allen Abmeldungen,
+        # damit pro Ordner nur ein SELECT/EXPUNGE nötig ist
+        if status == "success" and should_delete:
+            return nl, result
+
+        report(result)
+        return None
+
+    def report(result):
+        with _unsub_lock:
+            unsubscribe_status["current"] += 1
+            unsubscribe_status["results"].append(result)
+            event = {
+                "current": unsubscribe_status["current"],
+                "total": unsubscribe_status["total"],
+                "result": result
+            }
+        _publish(job_id, event)
+
+    worker_bot = None
+    try:
+        worker_bot = _get_unsubscribe_bot()
+
+        # Newsletter parallel abmelden (HTTP-Requests sind I/O-gebunden)
+        with ThreadPoolExecutor(max_workers=UNSUBSCRIBE_WORKERS) as executor:
+            pending_deletes = [p for p in executor.map(process, newsletters_to_unsubscribe) if p]
+
+        if pending_deletes:
+            try:
+                deleted = worker_bot.delete_emails([nl for nl, _ in pending_deletes])
+            except Exception as e:
+                deleted = {nl["id"]: (False, str(e)) for nl, _ in pending_deletes}
+            for nl, result in pending_deletes:
+                del_success, del_msg = deleted[nl["id"]]
+                if del_success:
+                    result["message"] += " + E-Mail geloescht"
+                else:
+                    result["message"] += f" (Loeschen fehlgeschlagen: {del_msg})"
+                report(result)
+
+        # IMAP-Verbindung an den Pool zurückgeben
+        worker_bot.disconnect()
+
+    except Exception as e:
+        result = {
+            "newsletter": "System",
+            "status": "error",
+            "message": str(e)
+        }
+        with _unsub_lock:
+            unsubscribe_status["results"].append(result)
+        _publish(job_id, {"result": result})
+    finally:
+        # processed.json einmal pro Batch statt pro Newsletter schreiben
+        if worker_bot:
+            try:
+                worker_bot.flush()
+            except Exception as e:
+                print(f"Fehler beim Speichern von processed.json: {e}")
+        with _unsub_lock:
+            unsubscribe_status["running"] = False
+            event = {
+                "current": unsubscribe_status["current"],
+                "total": unsubscribe_status["total"]
+            }
+        _publish(job_id, event, done=True)
+
+
+def _unsubscribe_worker():
+    """Arbeitet die Abmelde-Warteschlange nacheinander ab (Daemon-Thread)."""
+    global _open_unsubscribe_jobs
+    while True:
+        job_id, newsletters_to_unsubscribe, should_delete = _unsubscribe_queue.get()
+        try:
+            _run_unsubscribe_job(job_id, newsletters_to_unsubscribe, should_delete)
+        except Exception as e:
+            print(f"Fehler im Abmelde-Worker: {e}")
+        finally:
+            with _unsub_lock:
+                _open_unsubscribe_jobs -= 1
+            _unsubscribe_queue.task_done()
+
 
-    if unsubscribe_status["running"]:
-        return jsonify({"success": False, "message": "Abmeldung läuft bereits"})
+threading.Thread(target=_unsubscribe_worker, daemon=True).start()
 
+
+@app.route("/api/unsubscribe", methods=["POST"])
+def unsubscribe():
+    """Stellt die ausgewählten Newsletter zur Abmeldung in die Warteschlange."""
     data = request.json
-    newsletter_ids = data.get("ids", [])
+    newsletter_ids = set(data.get("ids", []))
     delete_emails = data.get("delete_emails", False)
 
     if not newsletter_ids:
         return jsonify({"success": False, "message": "Keine Newsletter ausgewählt"})
 
-    newsletters_to_unsubscribe = [
-        nl for nl in scan_status.get("newsletters", [])
-        if nl["id"] in newsletter_ids
-    ]
+    with _scan_lock:
+        newsletters_to_unsubscribe = [
+            nl for nl in scan_status["newsletters"]
+            if nl["id"] in newsletter_ids
+        ]
 
-    def do_unsubscribe(should_delete):
-        global bot, unsubscribe_status
-        unsubscribe_status["running"] = True
-        unsubscribe_status["current"] = 0
-        unsubscribe_status["total"] = len(newsletters_to_unsubscribe)
-        unsubscribe_status["results"] = []
+    global _open_unsubscribe_jobs
+    job_id = _create_job()
+    with _unsub_lock:
+        # Jobs vor diesem, inklusive eines gerade laufenden
+        queued = _open_unsubscribe_jobs
+        _open_unsubscribe_jobs += 1
+    # Vor dem Einreihen melden, damit das Event vor allen Worker-Events ankommt
+    _publish(job_id, {"current": 0, "total": len(newsletters_to_unsubscribe), "queued": queued})
+    _unsubscribe_queue.put((job_id, newsletters_to_unsubscribe, delete_emails))
 
-        try:
-            bot = MailBot()
-
-            for i, nl in enumerate(newsletters_to_unsubscribe):
-                unsubscribe_status["current"] = i + 1
-
-                results = bot.unsubscribe(nl)
-
-                status = "error"
-                message = "Keine Abmelde-Links gefunden"
-
-                if results:
-                    if any(r["status"] == "success" for r in results):
-                        status = "success"
-                        message = "Erfolgreich abgemeldet"
-
-                        # E-Mail löschen wenn Option aktiviert
-                        if should_delete:
-                            del_success, del_msg = bot.delete_email(nl)
-                            if del_success:
-                                message += " + E-Mail geloescht"
-                            else:
-                                message += f" (Loeschen fehlgeschlagen: {del_msg})"
-
-                    elif any(r["status"] == "needs_confirmation" for r in results):
-                        status = "needs_confirmation"
-                        message = "Manuelle Bestätigung erforderlich"
-                        # Link für manuelle Bestätigung hinzufügen
-                        for r in results:
-                            if r["status"] == "needs_confirmation":
-                                message += f" - {r['link']}"
-                                break
-                    else:
-                        message = results[0].get("message", "Fehler")
-
-                unsubscribe_status["results"].append({
-                    "newsletter": nl["from"],
-                    "status": status,
-                    "message": message
-                })
-
-            # Verbindung trennen
-            bot.disconnect()
-
-        except Exception as e:
-            unsubscribe_status["results"].append({
-                "newsletter": "System",
-                "status": "error",
-                "message": str(e)
-            })
-        finally:
-            unsubscribe_status["running"] = False
+    message = "Abmeldung gestartet" if not queued else f"Abmeldung eingereiht ({queued} vor dir)"
+    return jsonify({"success": True, "message": message, "job_id": job_id}), 202
 
-    thread = threading.Thread(target=do_unsubscribe, args=(delete_emails,))
-    thread.start()
 
-    return jsonify({"success": True, "message": "Abmeldung gestartet"})
+@app.route("/api/unsubscribe/stream/<job_id>")
+def unsubscribe_stream(job_id):
+    """Streamt den Abmelde-Fortschritt als Server-Sent Events."""
+    return _stream_job(job_id)
 
 
 @app.route("/api/unsubscribe/status")
 def unsubscribe_status_api():
     """Gibt den aktuellen Abmelde-Status zurück."""
-    return jsonify(unsubscribe_status)
+    with _unsub_lock:
+        snapshot = dict(unsubscribe_status)
+        snapshot["results"] = list(unsubscribe_status["results"])
+        # Noch wartende Jobs (der laufende zählt nicht mit)
+        snapshot["queued"] = _open_unsubscribe_jobs - (1 if unsubscribe_status["running"] else 0)
+    return jsonify(snapshot)
 
 
 if __name__ == "__main__":
@@ -239,4 +435,6 @@ if __name__ == "__main__":
     print("=" * 50)
     print("\nStarte Web-Server...")
     print("Öffne http://localhost:5000 in deinem Browser\n")
-    app.run(host="127.0.0.1", port=5000, debug=True)
+    # Kein Debug-Modus: der Reloader würde einen zweiten Prozess mit eigenem
+    # Status und Verbindungspool starten
+    app.run(host="127.0.0.1", port=5000, debug=False, threaded=True)
@@ -1,60 +1,329 @@
 import imaplib
-import email
 from email.header import decode_header
+from email.parser import BytesHeaderParser
 import re
 import json
 import os
+import tempfile
 import requests
-from bs4 import BeautifulSoup
-from datetime import datetime
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from bs4 import BeautifulSoup, FeatureNotFound
+from datetime import datetime, timedelta
 from cryptography.fernet import Fernet
 import base64
+import codecs
 import hashlib
 import time
+import threading
+import copy
+import queue
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from functools import lru_cache
+
+# orjson ist optional - deutlich schneller beim Lesen/Schreiben der JSON-Dateien
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 # Playwright ist optional - wird nur für automatische Bestätigung benötigt
 try:
     from playwright.sync_api import sync_playwright
+    from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
     PLAYWRIGHT_AVAILABLE = True
 except ImportError:
     PLAYWRIGHT_AVAILABLE = False
 
 CONFIG_FILE = "config.json"
 PROCESSED_FILE = "processed.json"
+SCAN_CACHE_FILE = "scan_cache.json"
+FOLDERS_CACHE_FILE = "folders.json"
+
+# Ordnerliste ändert sich selten, LIST höchstens einmal pro Tag
+FOLDERS_CACHE_TTL = 24 * 60 * 60
 KEY_FILE = ".key"
 
+# iCloud trennt inaktive IMAP-Verbindungen nach ca. 30 Minuten
+IMAP_KEEPALIVE_INTERVAL = 25 * 60
+# Socket-Timeout in Sekunden, damit eine still getrennte Verbindung
+# (z.B. durch NAT) nicht endlos in recv hängt
+IMAP_TIMEOUT = 60
+
+# Freie IMAP-Verbindungen pro (Server, E-Mail) als [Verbindung, zuletzt benutzt].
+# imaplib ist nicht threadsicher, daher wird jede Verbindung exklusiv ausgeliehen.
+IMAP_MAX_IDLE_PER_KEY = 4
+_IMAP_POOL = {}
+_IMAP_POOL_LOCK = threading.Lock()
+_KEEPALIVE_THREAD = None
+
+# Parst nur Header, der FETCH liefert ohnehin keinen Body
+_HEADER_PARSER = BytesHeaderParser()
+# Header, die beim Scan ausgewertet werden (vgl. HEADER_FETCH_ITEMS)
+SCAN_HEADER_NAMES = ("List-Unsubscribe-Post", "From", "Subject", "Date", "Message-ID")
+
+# Vorkompilierte Muster (werden pro Nachricht bzw. Link verwendet)
+_RE_ANGLE_EMAIL = re.compile(r'<([^>]+)>')
+_RE_HTTP_UNSUB = re.compile(rb'<(https?://[^>]+)>')
+_RE_MAILTO_UNSUB = re.compile(rb'<(mailto:[^>]+)>')
+# Beliebige Header-Zeile inkl. Folgezeilen: Name und roher Wert
+_RE_HEADER_FIELD = re.compile(rb'^([^:\s]+):[ \t]*(.*(?:\r?\n[ \t].*)*)', re.M)
+# Roher List-Unsubscribe Header inkl. Folgezeilen (nicht List-Unsubscribe-Post)
+_RE_LIST_UNSUB_HEADER = re.compile(rb'^List-Unsubscribe:(.*(?:\r?\n[ \t].*)*)', re.I | re.M)
+_RE_FOLDER = re.compile(r'"([^"]+)"$|(\S+)$')
+_RE_CONFIRM = re.compile(r"(confirm|unsubscribe|abmelden|bestätigen|yes)", re.I)
+_RE_FETCH_UID = re.compile(rb'\bUID (\d+)')
+
+# Typische Button/Link-Texte für Unsubscribe-Bestätigung (mehrsprachig)
+CONFIRM_PATTERNS = [
+    # Deutsch
+    r"abmelden", r"abbestellen", r"austragen", r"bestätigen", r"ja.*abmelden",
+    r"newsletter.*abmelden", r"abmeldung.*bestätigen",
+    # Englisch
+    r"unsubscribe", r"confirm", r"yes.*unsubscribe", r"opt.?out", r"remove",
+    r"stop.*emails?", r"cancel.*subscription",
+    # Französisch
+    r"désabonner", r"se désinscrire",
+    # Spanisch
+    r"cancelar.*suscripci", r"darse de baja",
+]
+_RE_CONFIRM_BUTTON = re.compile("|".join(CONFIRM_PATTERNS), re.I)
+
+# Texte, an denen eine erfolgreiche Abmeldung zu erkennen ist; als ein Muster
+# kompiliert, damit die Seite nur einmal durchsucht wird
+SUCCESS_INDICATORS = [
+    "erfolgreich abgemeldet", "successfully unsubscribed",
+    "have been unsubscribed", "wurden abgemeldet",
+    "you are now unsubscribed", "abmeldung erfolgreich",
+    "subscription cancelled", "removed from", "opted out"
+]
+_RE_SUCCESS = re.compile("|".join(map(re.escape, SUCCESS_INDICATORS)), re.I)
+# Dieselben Texte für rohe Bytes (alle ASCII), spart das Dekodieren der Seite
+_RE_SUCCESS_BYTES = re.compile(_RE_SUCCESS.pattern.encode(), re.I)
+_SUCCESS_MAX_LEN = max(len(indicator) for indicator in SUCCESS_INDICATORS)
+# Byte Order Marks, die den Zeichensatz einer Seite eindeutig festlegen
+_BOM_ENCODINGS = (
+    (codecs.BOM_UTF32_LE, "utf-32"), (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"), (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+# Sichtbarer Text der Seite (deutlich kleiner als page.content())
+_PAGE_TEXT_JS = "() => document.body ? document.body.innerText : ''"
+
+# Sucht im Browser in dieser Reihenfolge: sichtbare Buttons mit passendem Text,
+# Links mit passendem Text, erster Submit-Button eines Formulars. Der Treffer wird
+# nur markiert; geklickt wird über Playwright, das auf eine Navigation wartet.
+CONFIRM_MARK_ATTRIBUTE = "data-newsletterbot-confirm"
+_CONFIRM_MARK_JS = """(pattern) => {
+    const re = new RegExp(pattern, "i");
+    const visible = (el) => el.getClientRects().length > 0;
+    const matches = (el) => visible(el) && re.test(el.innerText || el.value || "");
+    const hit =
+        [...document.querySelectorAll("button, input[type='submit'], input[type='button']")].find(matches) ||
+        [...document.querySelectorAll("a")].find(matches) ||
+        [...document.querySelectorAll("form button[type='submit'], form input[type='submit']")].find(visible);
+    if (!hit) {
+        return false;
+    }
+    hit.setAttribute("%s", "1");
+    return true;
+}""" % CONFIRM_MARK_ATTRIBUTE
+
+# Formulare und Submit-/Button-Elemente direkt im HTML erkennen
+_RE_CONFIRM_MARKUP = re.compile(
+    rb'<form[\s>]|<(?:button|input)\b[^>]*\btype=["\']?(?:submit|button)\b',
+    re.I
+)
+
+# HTML-Parser für BeautifulSoup; fällt auf html.parser zurück, falls lxml fehlt
+_HTML_PARSER = "lxml"
+
+# Von Abmelde-Seiten wird höchstens so viel gelesen und geparst
+UNSUBSCRIBE_MAX_BODY_BYTES = 128 * 1024
+# Ungebrauchte Bodies bis zu dieser Größe werden trotzdem gelesen, damit die
+# Verbindung offen in den Pool der Session zurückgeht
+UNSUBSCRIBE_DRAIN_BYTES = 16 * 1024
+
+# User-Agent für alle Abmelde-Requests (manche Anbieter blocken python-requests)
+HTTP_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+
+# User-Agent des Headless-Browsers für die automatische Bestätigung
+BROWSER_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+# Parallele Browser für die automatische Bestätigung (je ein Chromium, daher
+# weniger als UNSUBSCRIBE_WORKERS)
+BROWSER_WORKERS = 4
+# Höchstens so lange wird nach Laden bzw. Klick auf Ruhe im Netzwerk gewartet
+BROWSER_IDLE_TIMEOUT_MS = 3000
+
+# Maximale Anzahl paralleler HTTP-Abmeldungen
+UNSUBSCRIBE_WORKERS = 8
+
+# UIDs pro FETCH-Kommando (Server begrenzen die Länge der Kommandozeile)
+FETCH_BATCH_SIZE = 150
+
+# So viele der neuesten Nachrichten werden geprüft, um festzustellen, ob der
+# Server die Suche nach List-Unsubscribe ignoriert
+HEADER_SEARCH_PROBE_SIZE = 50
+
+# Höchstens so viele FETCH-Kommandos gleichzeitig unterwegs, damit weder
+# Server noch Client an vollen TCP-Puffern hängen bleiben
+PIPELINE_WINDOW = 4
+
+# Nur die Header, die beim Scan ausgewertet werden; PEEK setzt kein \Seen
+# (aus SCAN_HEADER_NAMES abgeleitet, damit FETCH und Parser nicht auseinanderlaufen)
+HEADER_FETCH_ITEMS = "(BODY.PEEK[HEADER.FIELDS ({})])".format(
+    " ".join(name.upper() for name in ("List-Unsubscribe",) + SCAN_HEADER_NAMES)
+)
+
+
+_KEY_CACHE = None
+_FERNET_CACHE = None
+_KEY_LOCK = threading.Lock()
+
 
 def get_or_create_key():
-    """Erstellt oder lädt den Verschlüsselungsschlüssel."""
-    if os.path.exists(KEY_FILE):
-        with open(KEY_FILE, "rb") as f:
-            return f.read()
-    else:
-        key = Fernet.generate_key()
-        with open(KEY_FILE, "wb") as f:
-            f.write(key)
-        return key
+    """Erstellt oder lädt den Verschlüsselungsschlüssel (einmal pro Prozess)."""
+    global _KEY_CACHE
+    if _KEY_CACHE is not None:
+        return _KEY_CACHE
+
+    # Ohne Lock könnten zwei Threads beim ersten Start verschiedene Schlüssel erzeugen
+    with _KEY_LOCK:
+        if _KEY_CACHE is None:
+            if os.path.exists(KEY_FILE):
+                with open(KEY_FILE, "rb") as f:
+                    _KEY_CACHE = f.read()
+            else:
+                key = Fernet.generate_key()
+                with open(KEY_FILE, "wb") as f:
+                    f.write(key)
+                _KEY_CACHE = key
+    return _KEY_CACHE
+
+
+def _get_fernet():
+    """Gibt die zwischengespeicherte Fernet-Instanz zurück."""
+    global _FERNET_CACHE
+    if _FERNET_CACHE is None:
+        fernet = Fernet(get_or_create_key())
+        with _KEY_LOCK:
+            if _FERNET_CACHE is None:
+                _FERNET_CACHE = fernet
+    return _FERNET_CACHE
 
 
 def encrypt_password(password):
     """Verschlüsselt das Passwort."""
-    key = get_or_create_key()
-    f = Fernet(key)
-    return f.encrypt(password.encode()).decode()
+    return _get_fernet().encrypt(password.encode()).decode()
 
 
 def decrypt_password(encrypted_password):
     """Entschlüsselt das Passwort."""
-    key = get_or_create_key()
-    f = Fernet(key)
-    return f.decrypt(encrypted_password.encode()).decode()
+    return _get_fernet().decrypt(encrypted_password.encode()).decode()
+
+
+# Geparste JSON-Dateien, invalidiert über die Änderungszeit der Datei
+_CONFIG_CACHE = {"mtime": None, "data": None}
+_PROCESSED_CACHE = {"mtime": None, "data": None}
+_SCAN_CACHE = {"mtime": None, "data": None}
+_FOLDERS_CACHE = {"mtime": None, "data": None}
+
+# Einträge in processed.json, die im Speicher als Set gehalten werden
+PROCESSED_SET_KEYS = ("processed_ids", "unsubscribed")
+
+# Präfix der Newsletter-IDs; IDs ohne Präfix stammen aus dem alten MD5-Schema
+MESSAGE_ID_VERSION = "v2:"
+
+
+def _json_loads(raw):
+    """Parst JSON-Bytes, mit orjson falls installiert."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _json_dumps(data):
+    """Serialisiert data als eingerücktes JSON (Bytes), mit orjson falls installiert."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2).encode("utf-8")
+
+
+def _load_json_cached(path, cache, convert=None):
+    """Lädt eine JSON-Datei, solange sie unverändert ist aus dem Cache.
+
+    convert wird einmal pro tatsächlichem Lesen auf die geparsten Daten angewendet.
+    """
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+    if cache["mtime"] != mtime:
+        with open(path, "rb") as f:
+            data = _json_loads(f.read())
+        cache["data"] = convert(data) if convert else data
+        cache["mtime"] = mtime
+    return cache["data"]
+
+
+def _save_json_cached(path, cache, data, snapshot):
+    """Schreibt eine JSON-Datei und übernimmt den Inhalt direkt in den Cache.
+
+    snapshot ist eine Kopie von data, damit spätere Änderungen des Aufrufers
+    nicht im Cache landen. Eine bestehende Datei behält ihre Zugriffsrechte;
+    neu angelegte Dateien erhalten wie bei mkstemp nur Rechte für den Besitzer (0600).
+    """
+    # Erst in eine temporäre Datei schreiben, dann atomar ersetzen
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".json")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_json_dumps(data))
+        try:
+            os.chmod(tmp_path, os.stat(path).st_mode & 0o7777)
+        except FileNotFoundError:
+            pass
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    cache["data"] = snapshot
+    cache["mtime"] = os.stat(path).st_mtime_ns
+
+
+def _copy_processed(processed):
+    """Flache Kopie des Processed-Dicts inklusive der enthaltenen Container."""
+    return {
+        key: value.copy() if isinstance(value, (list, set, dict)) else value
+        for key, value in processed.items()
+    }
+
+
+def _processed_from_json(data):
+    """Wandelt die ID-Listen aus der Datei in Sets für O(1)-Lookups um."""
+    for key in PROCESSED_SET_KEYS:
+        data[key] = set(data.get(key, []))
+    return data
+
+
+def _processed_to_json(processed):
+    """Wandelt Sets für die JSON-Datei wieder in (sortierte) Listen um."""
+    return {
+        key: sorted(value) if isinstance(value, set) else value
+        for key, value in processed.items()
+    }
 
 
 def load_config():
     """Lädt die Konfiguration aus der JSON-Datei."""
-    if os.path.exists(CONFIG_FILE):
-        with open(CONFIG_FILE, "r") as f:
-            return json.load(f)
+    config = _load_json_cached(CONFIG_FILE, _CONFIG_CACHE)
+    if config is not None:
+        # Kopie, da Aufrufer die Konfiguration verändern (z.B. Passwort maskieren)
+        return dict(config)
     return {
         "email": "",
         "password": "",
@@ -65,29 +334,83 @@ def load_config():
 
 def save_config(config):
     """Speichert die Konfiguration in die JSON-Datei."""
-    with open(CONFIG_FILE, "w") as f:
-        json.dump(config, f, indent=2)
+    _save_json_cached(CONFIG_FILE, _CONFIG_CACHE, config, dict(config))
 
 
 def load_processed():
     """Lädt die Liste der bereits verarbeiteten Newsletter."""
-    if os.path.exists(PROCESSED_FILE):
-        with open(PROCESSED_FILE, "r") as f:
-            return json.load(f)
-    return {"processed_ids": [], "unsubscribed": []}
+    processed = _load_json_cached(PROCESSED_FILE, _PROCESSED_CACHE, _processed_from_json)
+    if processed is not None:
+        return _copy_processed(processed)
+    return {"processed_ids": set(), "unsubscribed": set()}
 
 
 def save_processed(processed):
     """Speichert die Liste der verarbeiteten Newsletter."""
-    with open(PROCESSED_FILE, "w") as f:
-        json.dump(processed, f, indent=2)
+    _save_json_cached(
+        PROCESSED_FILE, _PROCESSED_CACHE,
+        _processed_to_json(processed), _copy_processed(processed)
+    )
+
+
+def load_scan_cache(account):
+    """Lädt die zuletzt gescannten Newsletter pro Ordner für ein Konto."""
+    scan_cache = _load_json_cached(SCAN_CACHE_FILE, _SCAN_CACHE)
+    if scan_cache is not None and scan_cache.get("account") == account:
+        # Ordner-Einträge werden beim Scan nur ersetzt, nie verändert
+        return {
+            "account": account,
+            "header_search": scan_cache.get("header_search"),
+            "folders": dict(scan_cache["folders"])
+        }
+    return {"account": account, "header_search": None, "folders": {}}
+
+
+def save_scan_cache(scan_cache):
+    """Speichert die gescannten Newsletter pro Ordner."""
+    snapshot = {
+        "account": scan_cache["account"],
+        "header_search": scan_cache.get("header_search"),
+        "folders": dict(scan_cache["folders"])
+    }
+    _save_json_cached(SCAN_CACHE_FILE, _SCAN_CACHE, scan_cache, snapshot)
+
+
+def load_folders_cache(account):
+    """Gibt die gecachte Ordnerliste zurück, None wenn veraltet oder fremdes Konto."""
+    folders_cache = _load_json_cached(FOLDERS_CACHE_FILE, _FOLDERS_CACHE)
+    if (
+        folders_cache is None
+        or folders_cache.get("account") != account
+        or time.time() - folders_cache.get("fetched_at", 0) > FOLDERS_CACHE_TTL
+    ):
+        return None
+    return list(folders_cache["folders"])
+
+
+def save_folders_cache(account, folders):
+    """Speichert die Ordnerliste eines Kontos mit Zeitstempel."""
+    folders_cache = {"account": account, "fetched_at": time.time(), "folders": list(folders)}
+    _save_json_cached(FOLDERS_CACHE_FILE, _FOLDERS_CACHE, folders_cache, dict(folders_cache))
 
 
 def decode_mime_header(header_value):
     """Dekodiert MIME-kodierte Header (z.B. Betreff, Absender)."""
     if header_value is None:
         return ""
+    if isinstance(header_value, str):
+        return _decode_mime_header_cached(header_value)
+    return _decode_mime_header(header_value)
+
 
+@lru_cache(maxsize=4096)
+def _decode_mime_header_cached(header_value):
+    """Zwischengespeichert, da derselbe Absender bei Newslettern oft wiederkehrt."""
+    return _decode_mime_header(header_value)
+
+
+def _decode_mime_header(header_value):
+    """Dekodiert einen Header ohne Cache (str oder email.header.Header)."""
     decoded_parts = []
     for part, charset in decode_header(header_value):
         if isinstance(part, bytes):
@@ -102,145 +425,824 @@ def decode_mime_header(header_value):
 
 def extract_email_address(from_header):
     """Extrahiert die E-Mail-Adresse aus dem From-Header."""
-    match = re.search(r'<([^>]+)>', from_header)
+    match = _RE_ANGLE_EMAIL.search(from_header)
     if match:
         return match.group(1)
     return from_header.strip()
 
 
+def parse_scan_headers(raw_headers):
+    """Parst den Header-Block eines Scans in ein Dict mit SCAN_HEADER_NAMES.
+
+    Die Werte sind immer rohe Strings (nicht MIME-dekodiert), genau wie sie
+    msg.get() des email-Moduls liefert; davon hängen die Message-IDs ab.
+    Reine ASCII-Header werden direkt per Regex gelesen, nur 8-Bit-Header
+    gehen durch den (langsameren) Header-Parser.
+    """
+    if raw_headers.isascii():
+        found = {}
+        for match in _RE_HEADER_FIELD.finditer(raw_headers):
+            name = match.group(1).decode("ascii").lower()
+            # Wie msg.get(): bei mehrfachen Headern zählt der erste
+            if name not in found:
+                found[name] = match.group(2).decode("ascii").rstrip("\r\n")
+        return {name: found.get(name.lower(), "") for name in SCAN_HEADER_NAMES}
+
+    # 8-Bit-Header liefert das email-Modul als Header-Objekt, daher str()
+    msg = _HEADER_PARSER.parsebytes(raw_headers)
+    return {name: str(msg.get(name, "")) for name in SCAN_HEADER_NAMES}
+
+
 def generate_message_id(msg):
-    """Generiert eine eindeutige ID für eine Nachricht."""
-    message_id = msg.get("Message-ID", "")
+    """Generiert eine eindeutige ID für eine Nachricht.
+
+    Die ID dient nur dem Abgleich innerhalb der App, daher genügt das schnelle
+    BLAKE2b. Gehasht wird trotzdem, weil die ID ungefiltert im HTML landet.
+    Das Präfix MESSAGE_ID_VERSION unterscheidet sie von den MD5-IDs älterer
+    Versionen (siehe generate_legacy_message_id).
+    """
+    return MESSAGE_ID_VERSION + _message_id_digest(hashlib.blake2b(digest_size=16), msg)
+
+
+def generate_legacy_message_id(msg):
+    """ID nach dem alten MD5-Schema, wie sie in bestehenden processed.json steht."""
+    return _message_id_digest(hashlib.md5(), msg)
+
+
+def _message_id_digest(digest, msg):
+    """Hasht die Message-ID, ohne Message-ID stattdessen From, Date und Subject."""
+    # str(), weil das email-Modul 8-Bit-Header als Header-Objekt liefert
+    message_id = str(msg.get("Message-ID", ""))
     if message_id:
-        return hashlib.md5(message_id.encode()).hexdigest()
+        digest.update(message_id.encode("utf-8", "replace"))
+    else:
+        # Felder einzeln einspeisen; ergibt denselben Hash wie die aneinandergehängten Werte
+        for field in ("From", "Date", "Subject"):
+            digest.update(str(msg.get(field, "")).encode("utf-8", "replace"))
+    return digest.hexdigest()
+
+
+def has_legacy_ids(processed):
+    """True, wenn processed.json noch IDs nach dem alten MD5-Schema enthält."""
+    return any(
+        not newsletter_id.startswith(MESSAGE_ID_VERSION)
+        for key in PROCESSED_SET_KEYS
+        for newsletter_id in processed[key]
+    )
+
+
+def with_processed_state(newsletter, processed):
+    """Kopie eines Newsletters mit Verarbeitungsstatus aus processed.
+
+    Berücksichtigt auch die alte MD5-ID, solange sie noch in der Datei steht.
+    """
+    ids = {newsletter["id"], newsletter.get("legacy_id")}
+    return dict(
+        newsletter,
+        processed=not ids.isdisjoint(processed["processed_ids"]),
+        unsubscribed=not ids.isdisjoint(processed["unsubscribed"])
+    )
+
+
+def _compact_uid_set(uids):
+    """Baut ein IMAP-UID-Set, direkt aufeinanderfolgende UIDs als Bereich "a:b"."""
+    numbers = sorted(int(uid) for uid in uids)
+    ranges = []
+    for number in numbers:
+        if ranges and number == ranges[-1][1] + 1:
+            ranges[-1][1] = number
+        else:
+            ranges.append([number, number])
+    return ",".join(
+        str(first) if first == last else f"{first}:{last}"
+        for first, last in ranges
+    )
+
+
+def _expand_uid_set(uid_set):
+    """Gegenstück zu _compact_uid_set: "1:3,5" -> {"1", "2", "3", "5"}."""
+    uids = set()
+    for part in filter(None, uid_set.split(",")):
+        first, _, last = part.partition(":")
+        uids.update(str(number) for number in range(int(first), int(last or first) + 1))
+    return uids
+
+
+def _fetch_literals(msg_data):
+    """Liefert (UID, Literal) für die Antworten eines UID FETCH.
+
+    Die Reihenfolge der Items ist nicht festgelegt (RFC 3501). Schickt der
+    Server UID erst nach dem Literal, steht es im folgenden Element.
+    """
+    for index, response_part in enumerate(msg_data):
+        if not isinstance(response_part, tuple):
+            continue
+        uid_match = _RE_FETCH_UID.search(response_part[0])
+        if not uid_match and index + 1 < len(msg_data) and isinstance(msg_data[index + 1], bytes):
+            uid_match = _RE_FETCH_UID.search(msg_data[index + 1])
+        if uid_match:
+            yield uid_match.group(1).decode(), response_part[1]
+
+
+def _uid_batches(uids):
+    """Teilt UIDs in kompakte UID-Sets zu höchstens FETCH_BATCH_SIZE UIDs."""
+    uids = sorted(uids, key=int)
+    return [
+        _compact_uid_set(uids[start:start + FETCH_BATCH_SIZE])
+        for start in range(0, len(uids), FETCH_BATCH_SIZE)
+    ]
+
+
+def _pipelined_uid_fetch(connection, uid_sets, items):
+    """Sendet mehrere UID FETCH-Kommandos, bevor die erste Antwort gelesen wird.
+
+    IMAP erlaubt Pipelining (RFC 3501, 5.5): bis zu PIPELINE_WINDOW Kommandos
+    sind mit eigenem Tag gleichzeitig unterwegs, die Antworten werden per Tag
+    eingesammelt. Statt einer Round-Trip-Zeit pro Block fällt sie so nur selten
+    an. Nutzt die internen Tag-Funktionen von imaplib; fehlen sie, wird
+    sequentiell gefetcht.
+
+    Schlägt ein Kommando fehl (auch ein NO/BAD auf dem sequentiellen Weg), ist
+    der Zustand der Verbindung unklar (offene Tags, liegengebliebene Antworten).
+    Sie wird dann verworfen und kommt nicht zurück in den Pool.
+    """
+    try:
+        if len(uid_sets) == 1 or not hasattr(connection, "_command_complete"):
+            msg_data = []
+            for uid_set in uid_sets:
+                typ, batch_data = connection.uid("FETCH", uid_set, items)
+                if typ != "OK":
+                    raise imaplib.IMAP4.error(f"UID FETCH => {typ} {batch_data}")
+                msg_data.extend(batch_data)
+            return msg_data
+
+        pending = []
+        for uid_set in uid_sets:
+            pending.append(connection._command("UID", "FETCH", uid_set, items))
+            if len(pending) >= PIPELINE_WINDOW:
+                _complete_fetch(connection, pending.pop(0))
+        for tag in pending:
+            _complete_fetch(connection, tag)
+
+        # Untagged FETCH-Antworten aller Kommandos liegen gesammelt vor
+        _, msg_data = connection._untagged_response("OK", [None], "FETCH")
+        return msg_data
+    except BaseException:
+        _discard_connection(connection)
+        raise
+
+
+def _complete_fetch(connection, tag):
+    """Wartet auf die getaggte Antwort eines gepipelinten FETCH."""
+    typ, data = connection._command_complete("UID", tag)
+    if typ != "OK":
+        raise imaplib.IMAP4.error(f"UID FETCH => {typ} {data}")
+
+
+def _parse_html(markup):
+    """Parst HTML mit lxml; ohne lxml mit dem langsameren html.parser."""
+    global _HTML_PARSER
+    try:
+        return BeautifulSoup(markup, _HTML_PARSER)
+    except FeatureNotFound:
+        _HTML_PARSER = "html.parser"
+        return BeautifulSoup(markup, _HTML_PARSER)
+
+
+def _body_encoding(response, first_chunk):
+    """Zeichensatz eines Response-Bodys: BOM vor Header-Angabe, sonst UTF-8."""
+    for bom, encoding in _BOM_ENCODINGS:
+        if first_chunk.startswith(bom):
+            return encoding
+    return response.encoding or "utf-8"
+
+
+def _is_ascii_compatible(encoding):
+    """True, wenn ASCII-Texte in encoding als dieselben Bytes erscheinen."""
+    try:
+        return "a<".encode(encoding) == b"a<"
+    except LookupError:
+        return False
+
+
+def _read_limited(response, max_bytes, stop_pattern=None):
+    """Liest höchstens max_bytes (dekomprimierte) Bytes eines gestreamten Response-Bodys.
+
+    Mit stop_pattern (Bytes-Regex aus reinem ASCII) wird abgebrochen, sobald es
+    im bisher gelesenen Text vorkommt. Bei ASCII-kompatiblen Zeichensätzen wird
+    direkt auf den Bytes gesucht, sonst (z.B. UTF-16) auf inkrementell
+    dekodiertem Text.
+
+    Returns:
+        (body, found) Tuple
+    """
+    chunks = []
+    size = 0
+    tail = b""
+    text_pattern = None
+    decoder = None
+    found = False
+    for chunk in response.iter_content(chunk_size=16384):
+        if stop_pattern is not None and not chunks:
+            encoding = _body_encoding(response, chunk)
+            if not _is_ascii_compatible(encoding):
+                decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+                text_pattern = re.compile(stop_pattern.pattern.decode("ascii"), stop_pattern.flags)
+                tail = ""
+        chunks.append(chunk)
+        size += len(chunk)
+        if stop_pattern is not None:
+            # Ende des vorigen Chunks mitprüfen, falls ein Treffer über die Grenze geht
+            if decoder is not None:
+                window = tail + decoder.decode(chunk)
+                found = bool(text_pattern.search(window))
+            else:
+                window = tail + chunk
+                found = bool(stop_pattern.search(window))
+            if found:
+                break
+            tail = window[-_SUCCESS_MAX_LEN:]
+        if size >= max_bytes:
+            break
+    return b"".join(chunks)[:max_bytes], found
+
+
+def _drain_small_body(response, max_bytes=UNSUBSCRIBE_DRAIN_BYTES):
+    """Liest einen kleinen, ungebrauchten Body zu Ende.
+
+    requests schließt beim close() sonst den Socket, statt die Verbindung für
+    Keep-Alive in den Pool zurückzugeben. Größere Bodies werden nicht gelesen.
+    """
+    length = response.headers.get("Content-Length")
+    if length is not None and (not length.isdigit() or int(length) > max_bytes):
+        return
+    size = 0
+    try:
+        for chunk in response.iter_content(chunk_size=8192):
+            size += len(chunk)
+            if size > max_bytes:
+                return
+    except requests.RequestException:
+        pass  # Das Ergebnis steht schon fest, dann wird eben neu verbunden
+
+
+def _logout_quietly(connection):
+    """Meldet eine IMAP-Verbindung ab und ignoriert dabei Fehler."""
+    try:
+        connection.logout()
+    except:
+        pass
+
+
+def _discard_connection(connection):
+    """Schließt eine Verbindung ohne LOGOUT (z.B. wenn das Protokoll aus dem Tritt ist)."""
+    try:
+        connection.shutdown()
+    except Exception:
+        pass
+    connection.state = "LOGOUT"
+
+
+def _checkout_connection(key):
+    """Nimmt eine freie Verbindung exklusiv aus dem Pool (oder None)."""
+    with _IMAP_POOL_LOCK:
+        idle = _IMAP_POOL.get(key)
+        if idle:
+            return idle.pop()[0]
+    return None
+
+
+def _checkin_connection(key, connection):
+    """Legt eine Verbindung zur Wiederverwendung zurück in den Pool."""
+    if connection.state == "LOGOUT":
+        # Abgemeldete oder verworfene Verbindungen nicht wiederverwenden
+        return
+    surplus = None
+    with _IMAP_POOL_LOCK:
+        idle = _IMAP_POOL.setdefault(key, [])
+        idle.append([connection, time.time()])
+        if len(idle) > IMAP_MAX_IDLE_PER_KEY:
+            surplus = idle.pop(0)[0]
+    if surplus:
+        _logout_quietly(surplus)
+
+
+def _evict_connections(key):
+    """Entfernt alle freien Verbindungen eines Kontos und meldet sie ab."""
+    with _IMAP_POOL_LOCK:
+        idle = _IMAP_POOL.pop(key, [])
+    for connection, _ in idle:
+        _logout_quietly(connection)
+
+
+def _keepalive_loop():
+    """Hält freie Verbindungen im Pool per NOOP am Leben."""
+    while True:
+        time.sleep(60)
+        now = time.time()
+        # Unter dem Lock nur die fälligen Verbindungen herausnehmen, damit
+        # connect()/disconnect() nicht auf die NOOPs warten müssen
+        due = []
+        with _IMAP_POOL_LOCK:
+            for key, idle in _IMAP_POOL.items():
+                for entry in list(idle):
+                    if now - entry[1] >= IMAP_KEEPALIVE_INTERVAL:
+                        idle.remove(entry)
+                        due.append((key, entry[0]))
+
+        for key, connection in due:
+            try:
+                connection.noop()
+            except Exception:
+                # Tote Verbindung verwerfen, beim nächsten connect() neu aufbauen
+                _discard_connection(connection)
+            else:
+                _checkin_connection(key, connection)
+
+
+def _start_keepalive():
+    """Startet den Keepalive-Thread, falls er noch nicht läuft."""
+    global _KEEPALIVE_THREAD
+    if _KEEPALIVE_THREAD is None:
+        _KEEPALIVE_THREAD = threading.Thread(target=_keepalive_loop, daemon=True)
+        _KEEPALIVE_THREAD.start()
+
+
+def shutdown_pool():
+    """Meldet alle gepoolten IMAP-Verbindungen ab."""
+    with _IMAP_POOL_LOCK:
+        pools = list(_IMAP_POOL.values())
+        _IMAP_POOL.clear()
+    for idle in pools:
+        for connection, _ in idle:
+            _logout_quietly(connection)
+
+
+# Playwright-Objekte (sync API) sind an den Thread gebunden, der sie erzeugt hat.
+# Browser-Aufrufe laufen deshalb über BROWSER_WORKERS eigene Threads; jeder hält
+# seinen eigenen Chromium zwischen den Abmeldungen offen.
+_BROWSER_TASKS = None
+_BROWSER_THREADS = []
+_BROWSER_LOCK = threading.Lock()
+_BROWSER_LOCAL = threading.local()
+
+
+def _browser_worker(tasks):
+    """Arbeitet Browser-Aufgaben ab, bis None kommt, und schließt dann seinen Browser."""
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                return
+            func, args, future = task
+            try:
+                future.set_result(func(*args))
+            except BaseException as e:
+                future.set_exception(e)
+    finally:
+        _close_browser_state()
+
+
+def _run_in_browser_thread(func, *args):
+    """Führt func in einem der Browser-Threads aus und wartet auf das Ergebnis."""
+    global _BROWSER_TASKS, _BROWSER_THREADS
+    with _BROWSER_LOCK:
+        if _BROWSER_TASKS is None:
+            _BROWSER_TASKS = queue.Queue()
+            _BROWSER_THREADS = [
+                threading.Thread(
+                    target=_browser_worker, args=(_BROWSER_TASKS,),
+                    name=f"playwright-{i}", daemon=True
+                )
+                for i in range(BROWSER_WORKERS)
+            ]
+            for thread in _BROWSER_THREADS:
+                thread.start()
+        future = Future()
+        _BROWSER_TASKS.put((func, args, future))
+    return future.result()
+
+
+def _close_browser_state():
+    """Schließt Kontext, Browser und Playwright des aktuellen Browser-Threads."""
+    context = getattr(_BROWSER_LOCAL, "context", None)
+    browser = getattr(_BROWSER_LOCAL, "browser", None)
+    playwright = getattr(_BROWSER_LOCAL, "playwright", None)
+    _BROWSER_LOCAL.context = _BROWSER_LOCAL.browser = _BROWSER_LOCAL.playwright = None
+    for close in (
+        context.close if context else None,
+        browser.close if browser else None,
+        playwright.stop if playwright else None,
+    ):
+        if close is None:
+            continue
+        try:
+            close()
+        except Exception:
+            pass
+
+
+def _get_browser_context():
+    """Gibt den offenen Browser-Kontext des aktuellen Browser-Threads zurück.
 
-    from_addr = msg.get("From", "")
-    date = msg.get("Date", "")
-    subject = msg.get("Subject", "")
-    combined = f"{from_addr}{date}{subject}"
-    return hashlib.md5(combined.encode()).hexdigest()
+    Startet ihn bei Bedarf; ein abgestürzter Browser wird neu gestartet.
+    """
+    browser = getattr(_BROWSER_LOCAL, "browser", None)
+    if browser is not None and not browser.is_connected():
+        _close_browser_state()
+
+    if getattr(_BROWSER_LOCAL, "context", None) is None:
+        playwright = sync_playwright().start()
+        try:
+            browser = playwright.chromium.launch(headless=True)
+            context = browser.new_context(user_agent=BROWSER_USER_AGENT)
+        except Exception:
+            playwright.stop()
+            raise
+        _BROWSER_LOCAL.playwright = playwright
+        _BROWSER_LOCAL.browser = browser
+        _BROWSER_LOCAL.context = context
+    return _BROWSER_LOCAL.context
+
+
+def close_browser():
+    """Schließt alle offenen Browser und beendet die Browser-Threads."""
+    global _BROWSER_TASKS, _BROWSER_THREADS
+    with _BROWSER_LOCK:
+        tasks, threads = _BROWSER_TASKS, _BROWSER_THREADS
+        _BROWSER_TASKS, _BROWSER_THREADS = None, []
+        if tasks is None:
+            return
+        # Ein None pro Thread; jeder schließt dabei seinen eigenen Browser
+        for _ in threads:
+            tasks.put(None)
+    for thread in threads:
+        thread.join(timeout=30)
+
+
+def _wait_for_network_idle(page, timeout=BROWSER_IDLE_TIMEOUT_MS):
+    """Wartet, bis die Seite nichts mehr nachlädt, höchstens timeout ms."""
+    try:
+        page.wait_for_load_state("networkidle", timeout=timeout)
+    except PlaywrightTimeoutError:
+        pass  # Seiten mit Dauer-Polling werden nie "idle"
 
 
 class MailBot:
     def __init__(self):
         self.config = load_config()
         self.processed = load_processed()
+        # Wird erst in scan_all() von der Platte geladen
+        self.scan_cache = {"account": None, "folders": {}}
         self.connection = None
+        # Gemeinsame HTTP-Session für alle (parallelen) Abmelde-Requests,
+        # hält TLS-Verbindungen zu häufigen Newsletter-Anbietern offen
+        self._session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=32,
+            pool_maxsize=64,
+            # Nur Verbindungsfehler und 5xx wiederholen; ein Read-Timeout würde
+            # sonst die Wartezeit pro Link verdreifachen
+            max_retries=Retry(
+                total=2,
+                read=0,
+                backoff_factor=0.3,
+                status_forcelist=(500, 502, 503, 504),
+                raise_on_status=False
+            )
+        )
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        self._session.headers.update({"User-Agent": HTTP_USER_AGENT})
+        self._processed_lock = threading.Lock()
+        # True, solange Änderungen an self.processed noch nicht gespeichert sind
+        self._dirty = False
+        # Serialisiert Zugriffe mehrerer Threads auf self.connection
+        self._connection_lock = threading.Lock()
+
+    def _pool_key(self):
+        """Schlüssel für die Verbindung im Pool."""
+        return (self.config["imap_server"], self.config["email"])
 
     def connect(self):
-        """Verbindet sich mit dem IMAP-Server."""
+        """Verbindet sich mit dem IMAP-Server.
+
+        Eine freie Verbindung aus dem Pool wird per NOOP geprüft und
+        wiederverwendet, sonst wird neu verbunden und angemeldet.
+        """
+        self.disconnect()
+        key = self._pool_key()
+
+        connection = _checkout_connection(key)
+        while connection:
+            try:
+                connection.noop()
+                self.connection = connection
+                return True, "Verbindung erfolgreich!"
+            except (imaplib.IMAP4.abort, imaplib.IMAP4.error, OSError):
+                _discard_connection(connection)
+                connection = _checkout_connection(key)
+
         try:
-            self.connection = imaplib.IMAP4_SSL(
+            connection = imaplib.IMAP4_SSL(
                 self.config["imap_server"],
-                self.config["imap_port"]
+                self.config["imap_port"],
+                timeout=IMAP_TIMEOUT
             )
 
             password = self.config["password"]
             if password.startswith("gAAAAA"):  # Verschlüsseltes Passwort
                 password = decrypt_password(password)
 
-            self.connection.login(self.config["email"], password)
-            return True, "Verbindung erfolgreich!"
+            connection.login(self.config["email"], password)
         except imaplib.IMAP4.error as e:
             return False, f"Anmeldefehler: {str(e)}"
         except Exception as e:
             return False, f"Verbindungsfehler: {str(e)}"
 
+        _start_keepalive()
+        self.connection = connection
+        return True, "Verbindung erfolgreich!"
+
     def disconnect(self):
-        """Trennt die Verbindung zum IMAP-Server."""
+        """Gibt die Verbindung an den Pool zurück (ohne Logout)."""
         if self.connection:
-            try:
-                self.connection.logout()
-            except:
-                pass
+            _checkin_connection(self._pool_key(), self.connection)
             self.connection = None
 
-    def get_folders(self):
-        """Gibt eine Liste der verfügbaren Ordner zurück."""
+    def _account_key(self):
+        """Kennung des Kontos für die Caches auf der Platte."""
+        return f'{self.config["email"]}|{self.config["imap_server"]}'
+
+    def get_folders(self, refresh=False):
+        """Gibt eine Liste der verfügbaren Ordner zurück.
+
+        Die Liste wird bis zu FOLDERS_CACHE_TTL Sekunden aus folders.json
+        bedient, erst danach (oder mit refresh=True) wird LIST gesendet.
+        """
+        account = self._account_key()
+        if not refresh:
+            cached = load_folders_cache(account)
+            if cached is not None:
+                return cached
+
         if not self.connection:
             return []
 
         _, folders = self.connection.list()
         folder_names = []
         for folder in folders:
-            match = re.search(r'"([^"]+)"$|(\S+)$', folder.decode())
+            match = _RE_FOLDER.search(folder.decode())
             if match:
                 name = match.group(1) or match.group(2)
                 folder_names.append(name)
+
+        save_folders_cache(account, folder_names)
         return folder_names
 
-    def scan_folder(self, folder_name, limit=None):
-        """Scannt einen Ordner nach Newslettern."""
+    def scan_folder(self, folder_name, limit=None, since_days=None):
+        """Scannt einen Ordner nach Newslettern.
+
+        Header werden nur für UIDs geholt, die noch nicht im Scan-Cache liegen.
+
+        Args:
+            folder_name: Name des IMAP-Ordners
+            limit: Maximale Anzahl der neuesten Newsletter
+            since_days: Nur Nachrichten der letzten X Tage berücksichtigen
+        """
         newsletters = []
 
         try:
             # Ordnername für iCloud anpassen
-            status, _ = self.connection.select(folder_name)
+            status, select_data = self.connection.select(folder_name)
             if status != "OK":
                 return newsletters
 
-            # Alle Nachrichten holen
-            _, message_numbers = self.connection.search(None, "ALL")
-            message_ids = message_numbers[0].split()
+            # UIDs sind nur innerhalb derselben UIDVALIDITY stabil
+            uidvalidity = self._select_response("UIDVALIDITY")
+            uidnext = self._select_response("UIDNEXT")
+            exists = select_data[0].decode() if select_data and select_data[0] else None
+            cached = self._cached_folder_newsletters(folder_name, uidvalidity)
+
+            # Ordner unverändert (keine neue UID, keine gelöschte Nachricht):
+            # Ergebnis des letzten Scans ohne SEARCH/FETCH übernehmen. Nicht
+            # nach einem Scan mit Zeitfenster, der deckt nur einen Teil ab.
+            folder_cache = self.scan_cache["folders"].get(folder_name, {})
+            if (
+                cached is not None
+                and uidnext
+                and not since_days
+                and folder_cache.get("uidnext") == uidnext
+                and folder_cache.get("exists") == exists
+                and folder_cache.get("limit") == limit
+                and folder_cache.get("since_days") is None
+            ):
+                return [
+                    self._with_processed_state(folder_cache["newsletters"][uid])
+                    for uid in folder_cache["order"]
+                ]
 
-            # Neueste zuerst, optional limitiert
+            # Nur Nachrichten mit List-Unsubscribe Header (filtert der Server).
+            # UIDs statt Sequenznummern, damit die IDs ein EXPUNGE überstehen.
+            date_criteria = []
+            if since_days:
+                since = datetime.now() - timedelta(days=since_days)
+                date_criteria = ["SINCE", since.strftime("%d-%b-%Y")]
+
+            # Manche Server ignorieren die Suche nach beliebigen Headern und
+            # liefern immer nichts. Das wird einmal pro Konto festgestellt.
+            header_search = self.scan_cache.get("header_search")
+            message_ids = None
+            if header_search is not False:
+                message_ids = self._search_uids(["HEADER", "List-Unsubscribe", '""'] + date_criteria)
+                if message_ids:
+                    self.scan_cache["header_search"] = True
+                elif (
+                    header_search is None
+                    and not since_days
+                    and exists and exists != "0"
+                    and self._newest_have_list_unsubscribe(exists)
+                ):
+                    self.scan_cache["header_search"] = False
+                    message_ids = None
+
+            server_filtered = message_ids is not None
+            if not server_filtered:
+                message_ids = self._search_uids(date_criteria or ["ALL"])
+
+            # Neueste zuerst, optional limitiert (ohne Server-Filter erst nach
+            # der Prüfung auf List-Unsubscribe)
             message_ids = message_ids[::-1]
-            if limit:
+            if limit and server_filtered:
                 message_ids = message_ids[:limit]
 
-            for num in message_ids:
-                try:
-                    _, msg_data = self.connection.fetch(num, "(RFC822.HEADER)")
-
-                    for response_part in msg_data:
-                        if isinstance(response_part, tuple):
-                            msg = email.message_from_bytes(response_part[1])
-
-                            # Prüfen ob Newsletter (List-Unsubscribe Header)
-                            list_unsubscribe = msg.get("List-Unsubscribe")
-
-                            if list_unsubscribe:
-                                msg_id = generate_message_id(msg)
-                                original_message_id = msg.get("Message-ID", "")
-                                from_header = decode_mime_header(msg.get("From", ""))
-                                subject = decode_mime_header(msg.get("Subject", ""))
-                                date_str = msg.get("Date", "")
-
-                                # Unsubscribe-Links extrahieren
-                                unsubscribe_links = self._extract_unsubscribe_links(list_unsubscribe)
-
-                                newsletter = {
-                                    "id": msg_id,
-                                    "message_id": original_message_id,
-                                    "from": from_header,
-                                    "from_email": extract_email_address(from_header),
-                                    "subject": subject,
-                                    "date": date_str,
-                                    "folder": folder_name,
-                                    "unsubscribe_links": unsubscribe_links,
-                                    "processed": msg_id in self.processed.get("processed_ids", []),
-                                    "unsubscribed": msg_id in self.processed.get("unsubscribed", [])
-                                }
-                                newsletters.append(newsletter)
-                except Exception as e:
-                    continue
+            # Nur unbekannte UIDs beim Server abfragen; ohne Server-Filter auch
+            # bekannte Nachrichten ohne List-Unsubscribe überspringen
+            if cached is None:
+                cached, skipped = {}, set()
+            else:
+                skipped = _expand_uid_set(folder_cache.get("skipped", ""))
+
+            if server_filtered:
+                new_ids = [uid for uid in message_ids if uid not in cached]
+                fetched = self._fetch_newsletters(folder_name, new_ids) if new_ids else {}
+            else:
+                fetched = self._fetch_newest_newsletters(folder_name, message_ids, cached, skipped, limit)
+
+            found = {}
+            for uid in message_ids:
+                newsletter = fetched.get(uid) or cached.get(uid)
+                if newsletter:
+                    found[uid] = newsletter
+                    newsletters.append(self._with_processed_state(newsletter))
+                    if limit and len(found) >= limit:
+                        break
+
+            folder_entry = {
+                "uidvalidity": uidvalidity,
+                "uidnext": uidnext,
+                "exists": exists,
+                "limit": limit,
+                "since_days": since_days,
+                "order": list(found),
+                "newsletters": found
+            }
+            if not server_filtered:
+                folder_entry["skipped"] = _compact_uid_set(skipped & set(message_ids))
+            self.scan_cache["folders"][folder_name] = folder_entry
 
         except Exception as e:
             print(f"Fehler beim Scannen von {folder_name}: {e}")
 
         return newsletters
 
+    def _newest_have_list_unsubscribe(self, exists):
+        """Prüft, ob unter den neuesten Nachrichten eine mit List-Unsubscribe ist.
+
+        Liefert die Header-Suche nichts, obwohl das zutrifft, ignoriert der
+        Server HEADER-Suchen.
+        """
+        first = max(1, int(exists) - HEADER_SEARCH_PROBE_SIZE + 1)
+        _, msg_data = self.connection.fetch(
+            f"{first}:{exists}", "(BODY.PEEK[HEADER.FIELDS (LIST-UNSUBSCRIBE)])"
+        )
+        return any(
+            isinstance(part, tuple) and _RE_LIST_UNSUB_HEADER.search(part[1])
+            for part in msg_data
+        )
+
+    def _fetch_newest_newsletters(self, folder_name, message_ids, cached, skipped, limit):
+        """Holt Header ohne Server-Filter blockweise, neueste zuerst.
+
+        Hört auf, sobald limit Newsletter bekannt sind. UIDs ohne
+        List-Unsubscribe landen in skipped und werden nicht erneut geholt.
+        """
+        fetched = {}
+        known = 0
+        for start in range(0, len(message_ids), FETCH_BATCH_SIZE):
+            batch = message_ids[start:start + FETCH_BATCH_SIZE]
+            new_ids = [uid for uid in batch if uid not in cached and uid not in skipped]
+            if new_ids:
+                result = self._fetch_newsletters(folder_name, new_ids)
+                fetched.update(result)
+                skipped.update(uid for uid in new_ids if uid not in result)
+            known += sum(1 for uid in batch if uid in fetched or uid in cached)
+            if limit and known >= limit:
+                break
+        return fetched
+
+    def _search_uids(self, criteria):
+        """UID SEARCH mit den angegebenen Kriterien, Ergebnis als Liste von UIDs."""
+        _, data = self.connection.uid("SEARCH", *criteria)
+        return [uid.decode() for uid in data[0].split()] if data and data[0] else []
+
+    def _select_response(self, code):
+        """Liest einen Status-Code (z.B. UIDNEXT) aus der SELECT-Antwort."""
+        _, data = self.connection.response(code)
+        return data[0].decode() if data and data[0] else None
+
+    def _with_processed_state(self, newsletter):
+        """Kopie eines Newsletters mit aktuellem Verarbeitungsstatus."""
+        return with_processed_state(newsletter, self.processed)
+
+    def _cached_folder_newsletters(self, folder_name, uidvalidity):
+        """Gibt die gecachten Newsletter eines Ordners nach UID zurück.
+
+        None, wenn es keinen gültigen Cache gibt (z.B. nach UIDVALIDITY-Wechsel).
+        """
+        folder_cache = self.scan_cache["folders"].get(folder_name)
+        if not folder_cache or not uidvalidity or folder_cache.get("uidvalidity") != uidvalidity:
+            # Neue UIDVALIDITY: alle UIDs sind ungültig, Ordner komplett neu scannen
+            return None
+        return folder_cache.get("newsletters", {})
+
+    def _fetch_newsletters(self, folder_name, uids):
+        """Holt die Header der angegebenen UIDs in wenigen FETCHs und parst sie.
+
+        Große Mengen werden in Blöcke zu FETCH_BATCH_SIZE aufgeteilt, damit der
+        Server die Kommandozeile nicht wegen Überlänge ablehnt.
+        """
+        newsletters = {}
+        # Die alte MD5-ID nur berechnen, solange processed.json sie noch braucht
+        with self._processed_lock:
+            legacy_ids = has_legacy_ids(self.processed)
+
+        msg_data = _pipelined_uid_fetch(self.connection, _uid_batches(uids), HEADER_FETCH_ITEMS)
+
+        for uid, headers in _fetch_literals(msg_data):
+            try:
+
+                # Ohne List-Unsubscribe kein Newsletter (nur relevant, wenn der
+                # Server die Header-Suche nicht unterstützt)
+                header_match = _RE_LIST_UNSUB_HEADER.search(headers)
+                if not header_match:
+                    continue
+
+                msg = parse_scan_headers(headers)
+
+                msg_id = generate_message_id(msg)
+                original_message_id = msg.get("Message-ID", "")
+                from_header = decode_mime_header(msg.get("From", ""))
+                subject = decode_mime_header(msg.get("Subject", ""))
+                date_str = msg.get("Date", "")
+
+                # Unsubscribe-Links direkt aus den rohen Header-Bytes extrahieren
+                unsubscribe_links = self._extract_unsubscribe_links(header_match.group(1))
+
+                newsletters[uid] = {
+                    "id": msg_id,
+                    "uid": uid,
+                    "message_id": original_message_id,
+                    "from": from_header,
+                    "from_email": extract_email_address(from_header),
+                    "subject": subject,
+                    "date": date_str,
+                    "folder": folder_name,
+                    "unsubscribe_links": unsubscribe_links,
+                    # RFC 8058: "List-Unsubscribe=One-Click" erlaubt Abmeldung per POST
+                    "one_click": "one-click" in msg.get("List-Unsubscribe-Post", "").lower()
+                }
+                if legacy_ids:
+                    newsletters[uid]["legacy_id"] = generate_legacy_message_id(msg)
+            except Exception as e:
+                continue
+
+        return newsletters
+
     def _extract_unsubscribe_links(self, header_value):
-        """Extrahiert Abmelde-Links aus dem List-Unsubscribe Header."""
+        """Extrahiert Abmelde-Links aus dem rohen List-Unsubscribe Header (Bytes).
+
+        Der Header ist laut RFC 2369 reines ASCII, dekodiert werden nur die Treffer.
+        """
         links = {"http": [], "mailto": []}
 
         # HTTP/HTTPS Links
-        http_matches = re.findall(r'<(https?://[^>]+)>', header_value)
-        links["http"] = http_matches
+        http_matches = _RE_HTTP_UNSUB.findall(header_value)
+        links["http"] = [m.decode("ascii", "replace") for m in http_matches]
 
         # Mailto Links
-        mailto_matches = re.findall(r'<(mailto:[^>]+)>', header_value)
-        links["mailto"] = mailto_matches
+        mailto_matches = _RE_MAILTO_UNSUB.findall(header_value)
+        links["mailto"] = [m.decode("ascii", "replace") for m in mailto_matches]
 
         return links
 
@@ -252,265 +1254,285 @@ class MailBot:
         if not PLAYWRIGHT_AVAILABLE:
             return False, "Playwright nicht installiert - führe 'pip install playwright && playwright install chromium' aus"
 
-        # Typische Button/Link-Texte für Unsubscribe-Bestätigung (mehrsprachig)
-        confirm_patterns = [
-            # Deutsch
-            r"abmelden", r"abbestellen", r"austragen", r"bestätigen", r"ja.*abmelden",
-            r"newsletter.*abmelden", r"abmeldung.*bestätigen",
-            # Englisch
-            r"unsubscribe", r"confirm", r"yes.*unsubscribe", r"opt.?out", r"remove",
-            r"stop.*emails?", r"cancel.*subscription",
-            # Französisch
-            r"désabonner", r"se désinscrire",
-            # Spanisch
-            r"cancelar.*suscripci", r"darse de baja",
-        ]
-
-        # Kombiniertes Pattern
-        button_pattern = re.compile("|".join(confirm_patterns), re.IGNORECASE)
-
         try:
-            with sync_playwright() as p:
-                # Headless Browser starten
-                browser = p.chromium.launch(headless=True)
-                context = browser.new_context(
-                    user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-                )
-                page = context.new_page()
-
-                # Seite laden
-                page.goto(url, timeout=15000, wait_until="domcontentloaded")
-                time.sleep(1)  # Kurz warten für JavaScript
-
-                # Prüfen ob bereits abgemeldet (Erfolgsmeldung auf der Seite)
-                page_text = page.content().lower()
-                success_indicators = [
-                    "erfolgreich abgemeldet", "successfully unsubscribed",
-                    "have been unsubscribed", "wurden abgemeldet",
-                    "you are now unsubscribed", "abmeldung erfolgreich",
-                    "subscription cancelled", "removed from", "opted out"
-                ]
-
-                for indicator in success_indicators:
-                    if indicator in page_text:
-                        browser.close()
-                        return True, "Bereits abgemeldet (Erfolgsmeldung gefunden)"
-
-                # Nach Bestätigungs-Buttons suchen
-                clicked = False
-
-                # Strategie 1: Buttons mit passendem Text
-                buttons = page.locator("button, input[type='submit'], input[type='button']")
-                count = buttons.count()
-
-                for i in range(count):
-                    try:
-                        btn = buttons.nth(i)
-                        btn_text = btn.inner_text() or btn.get_attribute("value") or ""
-                        if button_pattern.search(btn_text):
-                            btn.click(timeout=5000)
-                            clicked = True
-                            time.sleep(2)
-                            break
-                    except:
-                        continue
-
-                # Strategie 2: Links mit passendem Text
-                if not clicked:
-                    links = page.locator("a")
-                    count = links.count()
-
-                    for i in range(count):
-                        try:
-                            link = links.nth(i)
-                            link_text = link.inner_text() or ""
-                            if button_pattern.search(link_text):
-                                link.click(timeout=5000)
-                                clicked = True
-                                time.sleep(2)
-                                break
-                        except:
-                            continue
-
-                # Strategie 3: Formulare submitten
-                if not clicked:
-                    forms = page.locator("form")
-                    if forms.count() > 0:
-                        # Erstes Formular mit Submit-Button finden
-                        for i in range(forms.count()):
-                            try:
-                                form = forms.nth(i)
-                                submit_btn = form.locator("button[type='submit'], input[type='submit']").first
-                                if submit_btn.count() > 0:
-                                    submit_btn.click(timeout=5000)
-                                    clicked = True
-                                    time.sleep(2)
-                                    break
-                            except:
-                                continue
-
-                # Nach dem Klick: Prüfen ob Erfolgsmeldung erscheint
-                if clicked:
-                    time.sleep(2)
-                    page_text = page.content().lower()
-
-                    for indicator in success_indicators:
-                        if indicator in page_text:
-                            browser.close()
-                            return True, "Erfolgreich abgemeldet (automatisch bestätigt)"
-
-                    # Auch ohne explizite Erfolgsmeldung als Erfolg werten
-                    browser.close()
-                    return True, "Bestätigung geklickt - wahrscheinlich abgemeldet"
-
-                browser.close()
-                return False, "Kein Bestätigungsbutton gefunden"
-
+            return _run_in_browser_thread(self._auto_confirm_in_browser, url)
         except Exception as e:
             return False, f"Browser-Fehler: {str(e)}"
 
-    def scan_all(self, limit_per_folder=None):
-        """Scannt Posteingang und Spam nach Newslettern."""
-        all_newsletters = []
+    def _auto_confirm_in_browser(self, url):
+        """Klickt die Bestätigung in einem neuen Tab des offenen Browsers."""
+        page = _get_browser_context().new_page()
+        try:
+            # Seite laden und kurz auf nachladendes JavaScript warten
+            page.goto(url, timeout=15000, wait_until="domcontentloaded")
+            _wait_for_network_idle(page)
+
+            # Prüfen ob bereits abgemeldet (Erfolgsmeldung auf der Seite)
+            # Nur der sichtbare Text, ohne Markup und ohne Kopie in Kleinbuchstaben
+            page_text = page.evaluate(_PAGE_TEXT_JS)
+            if _RE_SUCCESS.search(page_text):
+                return True, "Bereits abgemeldet (Erfolgsmeldung gefunden)"
+
+            # Bestätigung mit einem einzigen Aufruf im Browser suchen statt
+            # Element für Element über Playwright abzufragen
+            clicked = page.evaluate(_CONFIRM_MARK_JS, _RE_CONFIRM_BUTTON.pattern)
+
+            # Nach dem Klick: Prüfen ob Erfolgsmeldung erscheint
+            if clicked:
+                # click() wartet auf eine ausgelöste Navigation
+                page.click(f"[{CONFIRM_MARK_ATTRIBUTE}]", timeout=5000)
+                page.wait_for_load_state("domcontentloaded")
+                _wait_for_network_idle(page)
+                page_text = page.evaluate(_PAGE_TEXT_JS)
+
+                if _RE_SUCCESS.search(page_text):
+                    return True, "Erfolgreich abgemeldet (automatisch bestätigt)"
+
+                # Auch ohne explizite Erfolgsmeldung als Erfolg werten
+                return True, "Bestätigung geklickt - wahrscheinlich abgemeldet"
+
+            return False, "Kein Bestätigungsbutton gefunden"
+        finally:
+            try:
+                page.close()
+            except Exception:
+                pass
+
+    def scan_all(self, limit_per_folder=None, since_days=None, progress_callback=None):
+        """Scannt Posteingang und Spam parallel nach Newslettern.
 
+        Args:
+            limit_per_folder: Maximale Anzahl Newsletter pro Ordner
+            since_days: Nur Nachrichten der letzten X Tage berücksichtigen
+            progress_callback: Optional, wird mit (ordner, newsletter) aufgerufen,
+                sobald ein Ordner fertig gescannt ist
+        """
         # iCloud Ordnernamen
         folders_to_scan = ["INBOX", "Junk"]
 
-        for folder in folders_to_scan:
-            newsletters = self.scan_folder(folder, limit_per_folder)
-            all_newsletters.extend(newsletters)
+        self.scan_cache = load_scan_cache(self._account_key())
+
+        # Jeder Ordner läuft in einem eigenen Thread mit eigener IMAP-Verbindung
+        folder_results = {}
+        with ThreadPoolExecutor(max_workers=len(folders_to_scan)) as executor:
+            futures = {
+                executor.submit(self._scan_folder_isolated, folder, limit_per_folder, since_days): folder
+                for folder in folders_to_scan
+            }
+            for future in as_completed(futures):
+                folder = futures[future]
+                folder_results[folder] = future.result()
+                if progress_callback:
+                    progress_callback(folder, folder_results[folder])
+
+        # Scan-Cache einmal nach allen Ordnern schreiben (Threads teilen sich das Dict)
+        try:
+            save_scan_cache(self.scan_cache)
+        except Exception as e:
+            print(f"Fehler beim Speichern des Scan-Caches: {e}")
 
-        # Duplikate entfernen (basierend auf Absender-E-Mail)
-        seen_senders = {}
+        # Duplikate entfernen (basierend auf Absender-E-Mail), Reihenfolge der
+        # Ordner beibehalten (Posteingang vor Spam)
+        seen_senders = set()
         unique_newsletters = []
 
-        for nl in all_newsletters:
-            sender = nl["from_email"].lower()
-            if sender not in seen_senders:
-                seen_senders[sender] = True
-                unique_newsletters.append(nl)
+        for folder in folders_to_scan:
+            for nl in folder_results[folder]:
+                sender = nl["from_email"].lower()
+                if sender not in seen_senders:
+                    seen_senders.add(sender)
+                    unique_newsletters.append(nl)
 
         return unique_newsletters
 
-    def unsubscribe(self, newsletter, auto_confirm=True):
+    def _scan_folder_isolated(self, folder_name, limit=None, since_days=None):
+        """Scannt einen Ordner über eine eigene Verbindung aus dem Pool."""
+        worker = copy.copy(self)
+        worker.connection = None
+
+        success, message = worker.connect()
+        if not success:
+            print(f"Fehler beim Scannen von {folder_name}: {message}")
+            return []
+
+        try:
+            return worker.scan_folder(folder_name, limit, since_days)
+        finally:
+            worker.disconnect()
+
+    def unsubscribe(self, newsletter, auto_confirm=True, persist=True):
         """Versucht, sich von einem Newsletter abzumelden.
 
         Args:
             newsletter: Newsletter-Daten mit unsubscribe_links
             auto_confirm: Wenn True, wird versucht Bestätigungsseiten automatisch zu bestätigen
+            persist: Wenn False, wird processed.json nicht sofort geschrieben;
+                der Aufrufer speichert dann gesammelt über flush()
         """
         results = []
 
         http_links = newsletter.get("unsubscribe_links", {}).get("http", [])
+        one_click = newsletter.get("one_click", False)
+
+        # Alle Links parallel aufrufen, Reihenfolge der Ergebnisse bleibt erhalten.
+        # Ein einzelner Link (der Normalfall) braucht keinen eigenen Thread-Pool.
+        if len(http_links) == 1:
+            results = [self._unsubscribe_link(http_links[0], auto_confirm, one_click)]
+        elif http_links:
+            with ThreadPoolExecutor(max_workers=min(UNSUBSCRIBE_WORKERS, len(http_links))) as executor:
+                results = list(executor.map(
+                    lambda link: self._unsubscribe_link(link, auto_confirm, one_click),
+                    http_links
+                ))
+
+        with self._processed_lock:
+            # Alte MD5-ID durch die neue ersetzen, der Status bleibt erhalten
+            legacy_id = newsletter.get("legacy_id")
+            for key in PROCESSED_SET_KEYS:
+                if legacy_id in self.processed[key]:
+                    self.processed[key].discard(legacy_id)
+                    self.processed[key].add(newsletter["id"])
+
+            # Als verarbeitet markieren
+            self.processed["processed_ids"].add(newsletter["id"])
+
+            # Bei Erfolg als abgemeldet markieren
+            if any(r["status"] == "success" for r in results):
+                self.processed["unsubscribed"].add(newsletter["id"])
+
+            if persist:
+                save_processed(self.processed)
+                self._dirty = False
+            else:
+                self._dirty = True
 
-        for link in http_links:
-            try:
-                # Erst GET versuchen
-                response = requests.get(
-                    link,
-                    timeout=10,
-                    headers={
-                        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-                    },
-                    allow_redirects=True
-                )
-
-                if response.status_code == 200:
-                    # Prüfen ob Bestätigung nötig
-                    soup = BeautifulSoup(response.text, "html.parser")
-                    page_text = response.text.lower()
-
-                    # Prüfen ob bereits abgemeldet
-                    success_indicators = [
-                        "erfolgreich abgemeldet", "successfully unsubscribed",
-                        "have been unsubscribed", "wurden abgemeldet",
-                        "you are now unsubscribed", "abmeldung erfolgreich",
-                        "subscription cancelled", "removed from", "opted out"
-                    ]
-
-                    already_unsubscribed = any(ind in page_text for ind in success_indicators)
+        return results
 
-                    if already_unsubscribed:
-                        results.append({
-                            "link": link,
-                            "status": "success",
-                            "message": "Erfolgreich abgemeldet"
-                        })
-                        continue
+    def flush(self):
+        """Speichert die verarbeiteten Newsletter (nach einem Batch mit persist=False).
 
-                    # Nach Bestätigungs-Buttons/Forms suchen
-                    forms = soup.find_all("form")
-                    confirm_buttons = soup.find_all(
-                        ["button", "input"],
-                        attrs={"type": ["submit", "button"]}
-                    )
-                    confirm_links = soup.find_all(
-                        "a",
-                        text=re.compile(r"(confirm|unsubscribe|abmelden|bestätigen|yes)", re.I)
+        Ohne ungespeicherte Änderungen wird nichts geschrieben.
+        """
+        with self._processed_lock:
+            if not self._dirty:
+                return
+            save_processed(self.processed)
+            self._dirty = False
+
+    def _unsubscribe_link(self, link, auto_confirm=True, one_click=False):
+        """Ruft einen einzelnen Abmelde-Link auf und gibt das Ergebnis zurück."""
+        try:
+            # One-Click (RFC 8058): ein POST genügt, keine Seite laden oder parsen
+            if one_click and link.startswith("https://"):
+                try:
+                    response = self._session.post(
+                        link,
+                        data={"List-Unsubscribe": "One-Click"},
+                        timeout=10
                     )
-
-                    needs_confirmation = bool(forms or confirm_buttons or confirm_links)
-
-                    if needs_confirmation and auto_confirm:
-                        # Automatische Bestätigung versuchen
-                        success, message = self._auto_confirm_unsubscribe(link)
-
-                        if success:
-                            results.append({
-                                "link": link,
-                                "status": "success",
-                                "message": message
-                            })
-                        else:
-                            results.append({
-                                "link": link,
-                                "status": "needs_confirmation",
-                                "message": f"Automatische Bestätigung fehlgeschlagen: {message}"
-                            })
-                    elif needs_confirmation:
-                        results.append({
-                            "link": link,
-                            "status": "needs_confirmation",
-                            "message": "Manuelle Bestätigung auf der Website erforderlich"
-                        })
-                    else:
-                        results.append({
+                    response.close()
+                    if response.status_code in (200, 202):
+                        return {
                             "link": link,
                             "status": "success",
-                            "message": "Erfolgreich abgemeldet"
-                        })
-                else:
-                    results.append({
-                        "link": link,
-                        "status": "error",
-                        "message": f"HTTP {response.status_code}"
-                    })
-
-            except requests.Timeout:
-                results.append({
-                    "link": link,
-                    "status": "error",
-                    "message": "Zeitüberschreitung"
-                })
-            except Exception as e:
-                results.append({
+                            "message": "Erfolgreich abgemeldet (One-Click)"
+                        }
+                except requests.RequestException:
+                    pass  # Weiter mit dem normalen GET
+
+            # Erst GET versuchen; Body wird erst gelesen, wenn er gebraucht wird
+            response = self._session.get(
+                link,
+                timeout=10,
+                allow_redirects=True,
+                stream=True
+            )
+            try:
+                return self._evaluate_unsubscribe_response(link, response, auto_confirm)
+            finally:
+                response.close()
+
+        except requests.Timeout:
+            return {
+                "link": link,
+                "status": "error",
+                "message": "Zeitüberschreitung"
+            }
+        except Exception as e:
+            return {
+                "link": link,
+                "status": "error",
+                "message": str(e)
+            }
+
+    def _evaluate_unsubscribe_response(self, link, response, auto_confirm=True):
+        """Wertet die Antwort eines Abmelde-Links aus."""
+        if response.status_code != 200:
+            _drain_small_body(response)
+            return {
+                "link": link,
+                "status": "error",
+                "message": f"HTTP {response.status_code}"
+            }
+
+        # API-Endpunkte ohne HTML-Seite: nichts zu parsen oder zu bestätigen,
+        # kleine Bodies werden nur für Keep-Alive gelesen
+        content_type = response.headers.get("Content-Type", "")
+        if content_type and "html" not in content_type.lower():
+            _drain_small_body(response)
+            return {
+                "link": link,
+                "status": "success",
+                "message": "Erfolgreich abgemeldet"
+            }
+
+        # Nur den Anfang der Seite laden, Bestätigungsformulare stehen weit oben;
+        # bei einer Erfolgsmeldung wird sofort aufgehört zu lesen
+        body, already_unsubscribed = _read_limited(
+            response, UNSUBSCRIBE_MAX_BODY_BYTES, _RE_SUCCESS_BYTES
+        )
+
+        # Prüfen ob bereits abgemeldet
+        if already_unsubscribed:
+            return {
+                "link": link,
+                "status": "success",
+                "message": "Erfolgreich abgemeldet"
+            }
+
+        # Nach Bestätigungs-Buttons/Forms suchen; BeautifulSoup nur, wenn die
+        # schnelle Byte-Suche nichts gefunden hat
+        needs_confirmation = bool(_RE_CONFIRM_MARKUP.search(body))
+        if not needs_confirmation:
+            soup = _parse_html(body)
+            needs_confirmation = any(_RE_CONFIRM.search(a.get_text()) for a in soup.find_all("a"))
+
+        if needs_confirmation and auto_confirm:
+            # Automatische Bestätigung versuchen
+            success, message = self._auto_confirm_unsubscribe(link)
+
+            if success:
+                return {
                     "link": link,
-                    "status": "error",
-                    "message": str(e)
-                })
-
-        # Als verarbeitet markieren
-        if newsletter["id"] not in self.processed["processed_ids"]:
-            self.processed["processed_ids"].append(newsletter["id"])
-
-        # Bei Erfolg als abgemeldet markieren
-        if any(r["status"] == "success" for r in results):
-            if newsletter["id"] not in self.processed["unsubscribed"]:
-                self.processed["unsubscribed"].append(newsletter["id"])
-
-        save_processed(self.processed)
-
-        return results
+                    "status": "success",
+                    "message": message
+                }
+            return {
+                "link": link,
+                "status": "needs_confirmation",
+                "message": f"Automatische Bestätigung fehlgeschlagen: {message}"
+            }
+        elif needs_confirmation:
+            return {
+                "link": link,
+                "status": "needs_confirmation",
+                "message": "Manuelle Bestätigung auf der Website erforderlich"
+            }
+        return {
+            "link": link,
+            "status": "success",
+            "message": "Erfolgreich abgemeldet"
+        }
 
     def delete_email(self, newsletter):
         """Löscht eine E-Mail aus dem Postfach.
@@ -521,46 +1543,119 @@ class MailBot:
         Returns:
             (success, message) Tuple
         """
-        message_id = newsletter.get("message_id")
-        folder = newsletter.get("folder")
+        return self.delete_emails([newsletter])[newsletter["id"]]
 
-        if not message_id:
-            return False, "Keine Message-ID vorhanden"
-
-        if not self.connection:
-            success, msg = self.connect()
-            if not success:
-                return False, f"Verbindungsfehler: {msg}"
-
-        try:
-            # Ordner auswählen
-            status, _ = self.connection.select(folder)
-            if status != "OK":
-                return False, f"Ordner '{folder}' nicht gefunden"
+    def delete_emails(self, newsletters):
+        """Löscht mehrere E-Mails gesammelt aus dem Postfach.
 
-            # Nach der Message-ID suchen
-            # Message-ID muss in Anführungszeichen für IMAP-Suche
-            search_id = message_id.strip("<>")
-            _, message_numbers = self.connection.search(None, f'HEADER Message-ID "<{search_id}>"')
+        Pro Ordner gibt es nur ein SELECT, ein STORE und ein EXPUNGE.
+        Kann der Server kein UIDPLUS (RFC 4315), entfernt das EXPUNGE auch
+        alle anderen Nachrichten, die im Ordner bereits als \\Deleted
+        markiert waren.
 
-            if not message_numbers[0]:
-                return False, "E-Mail nicht gefunden"
+        Args:
+            newsletters: Newsletter-Daten mit message_id, folder und (optional) uid
 
-            # Alle gefundenen Nachrichten löschen (sollte nur eine sein)
-            for num in message_numbers[0].split():
-                # Als gelöscht markieren
-                self.connection.store(num, '+FLAGS', '\\Deleted')
+        Returns:
+            Dict Newsletter-ID -> (success, message) Tuple
+        """
+        results = {}
+        by_folder = {}
+        for nl in newsletters:
+            if not nl.get("message_id"):
+                results[nl["id"]] = (False, "Keine Message-ID vorhanden")
+            else:
+                by_folder.setdefault(nl.get("folder"), []).append(nl)
+
+        if not by_folder:
+            return results
+
+        # IMAP-Verbindung ist nicht threadsicher
+        with self._connection_lock:
+            for folder, folder_newsletters in by_folder.items():
+                # Neu verbinden, wenn die Verbindung fehlt oder nach einem
+                # Fehler verworfen wurde
+                if not self.connection or self.connection.state == "LOGOUT":
+                    success, msg = self.connect()
+                    if not success:
+                        for nl in folder_newsletters:
+                            results[nl["id"]] = (False, f"Verbindungsfehler: {msg}")
+                        continue
 
-            # Gelöschte Nachrichten endgültig entfernen
-            self.connection.expunge()
+                try:
+                    results.update(self._delete_from_folder(folder, folder_newsletters))
+                except Exception as e:
+                    for nl in folder_newsletters:
+                        results[nl["id"]] = (False, f"Löschfehler: {str(e)}")
 
-            return True, "E-Mail gelöscht"
+        return results
 
-        except Exception as e:
-            return False, f"Löschfehler: {str(e)}"
+    def _delete_from_folder(self, folder, newsletters):
+        """Löscht die Newsletter eines Ordners (Aufrufer hält _connection_lock)."""
+        status, _ = self.connection.select(folder)
+        if status != "OK":
+            return {nl["id"]: (False, f"Ordner '{folder}' nicht gefunden") for nl in newsletters}
+
+        wanted = {nl["message_id"].strip().strip("<>") for nl in newsletters}
+        found = {}  # Message-ID -> UIDs
+
+        # UIDs aus dem Scan nur verwenden, wenn die Message-ID noch passt
+        # (z.B. nicht nach einem UIDVALIDITY-Wechsel)
+        scan_uids = [nl["uid"] for nl in newsletters if nl.get("uid")]
+        if scan_uids:
+            msg_data = _pipelined_uid_fetch(
+                self.connection, _uid_batches(scan_uids),
+                "(BODY.PEEK[HEADER.FIELDS (MESSAGE-ID)])"
+            )
+            for uid, headers in _fetch_literals(msg_data):
+                message_id = parse_scan_headers(headers)["Message-ID"].strip().strip("<>")
+                if message_id in wanted:
+                    found.setdefault(message_id, set()).add(uid)
+
+        # Übrige (z.B. aus älteren Scans ohne UID) über die Message-ID suchen
+        for message_id in wanted - set(found):
+            uids = self._search_uids(["HEADER", "Message-ID", f'"<{message_id}>"'])
+            if uids:
+                found[message_id] = set(uids)
+
+        delete_uids = set().union(*found.values())
+        failed = {}  # UID -> Fehlermeldung des Servers
+        if delete_uids:
+            # Als gelöscht markieren
+            for uid_set in _uid_batches(delete_uids):
+                typ, data = self.connection.uid("STORE", uid_set, "+FLAGS.SILENT", "(\\Deleted)")
+                if typ != "OK":
+                    failed.update(dict.fromkeys(_expand_uid_set(uid_set), f"UID STORE => {typ} {data}"))
+
+            # Gelöschte Nachrichten endgültig entfernen; mit UIDPLUS (RFC 4315)
+            # nur die eigenen, sonst alle als gelöscht markierten
+            expunge_uids = delete_uids - set(failed)
+            if expunge_uids and "UIDPLUS" in self.connection.capabilities:
+                for uid_set in _uid_batches(expunge_uids):
+                    typ, data = self.connection.uid("EXPUNGE", uid_set)
+                    if typ != "OK":
+                        failed.update(dict.fromkeys(_expand_uid_set(uid_set), f"UID EXPUNGE => {typ} {data}"))
+            elif expunge_uids:
+                typ, data = self.connection.expunge()
+                if typ != "OK":
+                    failed.update(dict.fromkeys(expunge_uids, f"EXPUNGE => {typ} {data}"))
+
+        results = {}
+        for nl in newsletters:
+            uids = found.get(nl["message_id"].strip().strip("<>"))
+            errors = [failed[uid] for uid in sorted(uids or (), key=int) if uid in failed]
+            if not uids:
+                results[nl["id"]] = (False, "E-Mail nicht gefunden")
+            elif errors:
+                results[nl["id"]] = (False, f"Löschfehler: {errors[0]}")
+            else:
+                results[nl["id"]] = (True, "E-Mail gelöscht")
+        return results
 
     def test_connection(self):
         """Testet die Verbindung zum IMAP-Server."""
+        # Neu anmelden, damit geänderte Zugangsdaten wirklich geprüft werden
+        _evict_connections(self._pool_key())
         success, message = self.connect()
         if success:
             self.disconnect()
@@ -0,0 +1,10 @@
+"""WSGI-Einstiegspunkt für den Produktivbetrieb.
+
+Nur mit einem Worker-Prozess starten: Bot, Scan-Status und
+IMAP-Verbindungspool sind prozessweite Globals.
+
+    gunicorn -w 1 -k gthread --threads 16 -b 127.0.0.1:5000 wsgi:app
+"""
+from app import app
+
+__all__ = ["app"]